@@ -9,11 +9,15 @@ import json
 import platform
 import logging
 import os
+import re
 import socket
 import subprocess
-from datetime import datetime
+import tempfile
+import zlib
+from datetime import datetime, time
 import uvicorn
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, Dict, Any, Union, List
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -387,7 +391,317 @@ async def delete_thread(thread_id: str):
             {"success": False, "message": f"Error deleting thread: {str(e)}"},
             status_code=500
         )
-    
+
+
+# Bulk export / import of threads
+EXPORT_CHUNK_SIZE = 64 * 1024   # flush compressed output roughly every 64KB
+IMPORT_BATCH_SIZE = 500         # threads written per batch during import
+IMPORT_READ_SIZE = 64 * 1024    # max decompressed bytes produced per step during import
+MAX_IMPORT_LINE_BYTES = 16 * 1024 * 1024  # larger lines are counted as failed
+DATE_ONLY_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+THREAD_ID_PATTERN = re.compile(r"^[A-Za-z0-9_\-]+$")
+
+
+def parse_timestamp(value):
+    """Parse an ISO timestamp into a naive local datetime, or None if invalid."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def iter_thread_files():
+    """Yield thread file paths one at a time without listing the whole directory."""
+    with os.scandir(THREADS_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(".json"):
+                yield entry.path
+
+
+def thread_matches(thread, model=None, since=None, until=None):
+    """Check a thread against the optional export filters."""
+    if model and thread.get("model") != model:
+        return False
+    if since or until:
+        created_at = parse_timestamp(thread.get("created_at"))
+        if created_at is None:
+            return False
+        if since and created_at < since:
+            return False
+        if until and created_at > until:
+            return False
+    return True
+
+
+def write_thread_file(thread):
+    """Atomically write a thread so a failed import never leaves a partial file."""
+    filename = os.path.join(THREADS_DIR, f"{thread['id']}.json")
+    tmp_filename = None
+    try:
+        with tempfile.NamedTemporaryFile('w', dir=THREADS_DIR, suffix=".tmp", delete=False) as f:
+            tmp_filename = f.name
+            json.dump(thread, f, indent=2)
+        os.replace(tmp_filename, filename)
+    finally:
+        if tmp_filename and os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+
+@app.get("/api/export_threads")
+def export_threads(
+    format: str = "ndjson",
+    model: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+):
+    """
+    Stream saved threads as NDJSON (one thread per line), optionally gzip-compressed.
+    Threads are read and written one at a time, so memory use does not grow with
+    the number of threads. A date-only `until` (YYYY-MM-DD) includes that whole day.
+    """
+    if format not in ("ndjson", "gzip"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'gzip'")
+    since_dt = parse_timestamp(since)
+    until_dt = parse_timestamp(until)
+    if (since and since_dt is None) or (until and until_dt is None):
+        raise HTTPException(status_code=400, detail="since/until must be ISO 8601 timestamps")
+    if until_dt and DATE_ONLY_PATTERN.match(until):
+        until_dt = datetime.combine(until_dt.date(), time.max)
+
+    logger.info(f"Exporting threads (format={format}, model={model}, since={since}, until={until})")
+
+    def iter_lines():
+        exported = 0
+        for file_path in iter_thread_files():
+            try:
+                with open(file_path, 'r') as f:
+                    thread = json.load(f)
+                if not isinstance(thread, dict):
+                    raise ValueError("thread is not a JSON object")
+                if not thread_matches(thread, model, since_dt, until_dt):
+                    continue
+            except Exception as e:
+                logger.error(f"Skipping unreadable thread file {file_path}: {str(e)}")
+                continue
+            exported += 1
+            yield (json.dumps(thread) + "\n").encode('utf-8')
+        logger.info(f"Exported {exported} threads")
+
+    def iter_gzip():
+        # wbits=31 produces a gzip container that `gunzip` and the import endpoint understand
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        pending = 0
+        for line in iter_lines():
+            data = compressor.compress(line)
+            pending += len(line)
+            if data:
+                yield data
+            if pending >= EXPORT_CHUNK_SIZE:
+                yield compressor.flush(zlib.Z_SYNC_FLUSH)
+                pending = 0
+        yield compressor.flush()
+
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    if format == "gzip":
+        return StreamingResponse(
+            iter_gzip(),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f'attachment; filename="threads-{timestamp}.ndjson.gz"'}
+        )
+    return StreamingResponse(
+        iter_lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="threads-{timestamp}.ndjson"'}
+    )
+
+
+@app.post("/api/import_threads")
+async def import_threads(request: Request, overwrite: bool = False):
+    """
+    Import threads from a streamed NDJSON upload (plain or gzip-compressed,
+    including concatenated gzip members). Threads whose ID already exists are
+    skipped unless overwrite is set, and duplicate IDs within the same upload
+    are only imported once. Lines over MAX_IMPORT_LINE_BYTES count as failed.
+    """
+    logger.info(f"Importing threads (overwrite={overwrite})")
+
+    stats = {"imported": 0, "skipped": 0, "failed": 0}
+    seen_ids = set()
+    batch = []
+
+    # Partial line carried between chunks; dropped once it exceeds the line limit
+    pending = bytearray()
+    oversized = False
+
+    def flush_batch():
+        # Runs in a worker thread so disk I/O doesn't block the event loop
+        for thread in batch:
+            try:
+                file_path = os.path.join(THREADS_DIR, f"{thread['id']}.json")
+                if not overwrite and os.path.exists(file_path):
+                    stats["skipped"] += 1
+                    continue
+                write_thread_file(thread)
+                stats["imported"] += 1
+            except Exception as e:
+                logger.error(f"Error writing imported thread {thread['id']}: {str(e)}")
+                stats["failed"] += 1
+        batch.clear()
+
+    def ingest_line(line):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            thread = json.loads(line)
+        except json.JSONDecodeError:
+            stats["failed"] += 1
+            return
+        if not isinstance(thread, dict) or not isinstance(thread.get("messages"), list):
+            stats["failed"] += 1
+            return
+        thread_id = str(thread.get("id", ""))
+        if not THREAD_ID_PATTERN.match(thread_id):
+            stats["failed"] += 1
+            return
+        # Optional metadata must be strings, and created_at must be a valid timestamp
+        # since get_threads sorts on it and export filters parse it
+        if any(
+            thread.get(field) is not None and not isinstance(thread.get(field), str)
+            for field in ("name", "created_at", "updated_at", "model")
+        ):
+            stats["failed"] += 1
+            return
+        if thread.get("created_at") and parse_timestamp(thread["created_at"]) is None:
+            stats["failed"] += 1
+            return
+        if thread_id in seen_ids:
+            stats["skipped"] += 1
+            return
+        seen_ids.add(thread_id)
+
+        now = datetime.now().isoformat()
+        batch.append({
+            "id": thread_id,
+            "name": thread.get("name") or "Imported thread",
+            "created_at": thread.get("created_at") or now,
+            "updated_at": thread.get("updated_at") or now,
+            "model": thread.get("model") or "unknown",
+            "messages": thread["messages"]
+        })
+
+    def feed(data):
+        """Split new bytes into lines, only scanning the bytes just received."""
+        nonlocal oversized
+        start = 0
+        while True:
+            index = data.find(b"\n", start)
+            if index == -1:
+                break
+            segment = data[start:index]
+            if oversized or len(pending) + len(segment) > MAX_IMPORT_LINE_BYTES:
+                stats["failed"] += 1
+            else:
+                pending.extend(segment)
+                ingest_line(bytes(pending))
+            pending.clear()
+            oversized = False
+            start = index + 1
+        rest = data[start:]
+        if oversized:
+            return
+        if len(pending) + len(rest) > MAX_IMPORT_LINE_BYTES:
+            pending.clear()
+            oversized = True
+        else:
+            pending.extend(rest)
+
+    try:
+        decompressor = None
+        in_member = False
+        head = b""
+        is_gzip = None
+
+        async def flush_if_full():
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await run_in_threadpool(flush_batch)
+
+        async def decompress(data):
+            """Decompress in bounded steps, starting a new decoder for each gzip member."""
+            nonlocal decompressor, in_member
+            while True:
+                if data:
+                    in_member = True
+                output = decompressor.decompress(data, IMPORT_READ_SIZE)
+                feed(output)
+                await flush_if_full()
+                if decompressor.eof:
+                    data = decompressor.unused_data
+                    decompressor = zlib.decompressobj(31)
+                    in_member = False
+                    if not data:
+                        return
+                    continue
+                data = decompressor.unconsumed_tail
+                if not data and len(output) < IMPORT_READ_SIZE:
+                    return
+
+        async for chunk in request.stream():
+            if not chunk:
+                continue
+            if is_gzip is None:
+                # Detect gzip by its magic bytes rather than trusting headers
+                head += chunk
+                if len(head) < 2:
+                    continue
+                chunk, head = head, b""
+                is_gzip = chunk[:2] == b"\x1f\x8b"
+                if is_gzip:
+                    decompressor = zlib.decompressobj(31)
+            if is_gzip:
+                await decompress(chunk)
+            else:
+                feed(chunk)
+                await flush_if_full()
+
+        if head:
+            feed(head)
+        if in_member:
+            raise zlib.error("Truncated gzip stream")
+        if oversized:
+            stats["failed"] += 1
+        elif pending:
+            ingest_line(bytes(pending))
+        await run_in_threadpool(flush_batch)
+
+        logger.info(
+            f"Import finished: {stats['imported']} imported, "
+            f"{stats['skipped']} skipped, {stats['failed']} failed"
+        )
+        return JSONResponse({"success": True, **stats})
+    except zlib.error as e:
+        logger.error(f"Error decompressing thread import: {str(e)}")
+        # Keep the threads parsed before the bad data so the counts match what's on disk
+        await run_in_threadpool(flush_batch)
+        return JSONResponse(
+            {"success": False, "message": f"Invalid gzip upload: {str(e)}", **stats},
+            status_code=400
+        )
+    except Exception as e:
+        logger.error(f"Error importing threads: {str(e)}")
+        import traceback
+        logger.error(traceback.format_exc())
+        await run_in_threadpool(flush_batch)
+        return JSONResponse(
+            {"success": False, "message": f"Error importing threads: {str(e)}", **stats},
+            status_code=500
+        )
+
 
 @app.post("/api/check_model")
 async def check_model(request: ModelCheckRequest):